@@ -1,3 +1,5 @@
+import sys
+from array import array
 
 from ast_nodes import (
     Program, GroupDef, GroupMember, WorldwideDecl, WorldwideListDecl, FuncDef, Parameter,
@@ -13,26 +15,321 @@ from ast_nodes import (
 # Sentinel for tail-epsilon result
 _TAIL_EMPTY = object()
 
+# Terminals that carry semantic value (pushed onto sem_stack)
+_SEMANTIC_TERMINALS = frozenset({
+    'identifier', 'num_lit', 'decimal_lit', 'string_lit', 'char_lit',
+    'Yes', 'No',
+    # Binary operators (folded by FOLD_TAIL / FOLD_EXP)
+    '+', '-', '*', '/', '//', '%', '**',
+    '||', '&&', '==', '!=', '>', '<', '>=', '<=',
+    # Compound assignment ops & increment/decrement
+    '+=', '-=', '*=', '/=', '//=', '%=', '**=', '++', '--',
+    # Unary
+    '!',
+    # Type keywords
+    'num', 'decimal', 'bigdecimal', 'bool', 'text', 'letter', 'empty',
+    # Keywords with semantic value
+    'fixed', 'stop', 'skip',
+    # NOTE: '=' is NOT semantic — it appears in declarations and
+    # assignment_tail but the specific production already determines
+    # the action to take.
+})
+
+# NTs that are simple pass-through (single NT child)
+_PASS_THROUGH_NTS = frozenset({
+    '<program>', '<stmt_value>', '<arg_value>', '<cond_value>',
+    '<index_value>',
+    '<stmt_post>', '<arg_post>', '<index_post>',
+    '<control_statement>', '<iterative_statement>',
+    '<declaration>', '<statement>',
+})
+
+# NTs for binary expression levels: <X> → <operand> <X_tail>
+# The whole operator chain is folded by <X>'s own action.
+_FOLD_TAIL_NTS = frozenset({
+    '<stmt_or>', '<stmt_and>', '<stmt_eq>', '<stmt_rel>',
+    '<stmt_add>', '<stmt_mult>',
+    '<arg_or>', '<arg_and>', '<arg_eq>', '<arg_rel>',
+    '<arg_add>', '<arg_mult>',
+    '<index_add>', '<index_mult>',
+})
+
+# NTs for binary tails: <X_tail> → op <operand> <X_tail> | λ
+# They run no action of their own, so an operator chain is a flat run
+# of op/operand values on sem_stack rather than nested tail lists.
+_BINARY_TAIL_NTS = frozenset({
+    '<stmt_or_tail>', '<stmt_and_tail>', '<stmt_eq_tail>',
+    '<stmt_rel_tail>', '<stmt_add_tail>', '<stmt_mult_tail>',
+    '<arg_or_tail>', '<arg_and_tail>', '<arg_eq_tail>',
+    '<arg_rel_tail>', '<arg_add_tail>', '<arg_mult_tail>',
+    '<index_add_tail>', '<index_mult_tail>',
+})
+
+# NTs for exponent: <X_exp> → <X_unary> <X_exp_tail>
+_FOLD_EXP_NTS = frozenset({
+    '<stmt_exp>', '<arg_exp>', '<index_exp>',
+})
+
+# NTs for exponent tails: <X_exp_tail> → ** <X_exp> | λ
+_BUILD_EXP_TAIL_NTS = frozenset({
+    '<stmt_exp_tail>', '<arg_exp_tail>', '<index_exp_tail>',
+})
+
+# List-accumulator NTs (recursive: item rest → prepend item to rest)
+_LIST_ACCUM_NTS = frozenset({
+    '<statements>', '<option_statements>',
+    '<local_declarations>',
+    '<group_body>', '<group_body_tail>',
+    '<option_blocks>',
+    '<val_list_rows>', '<val_list_rows_tail>',
+})
+
+# List-tail NTs (comma-separated: , item rest → prepend item to rest)
+_LIST_TAIL_NTS = frozenset({
+    '<parameter_list_tail>', '<arg_list_tail>',
+    '<val_list_tail>',
+})
+
+# Expression contexts that each carry their own <X_id_suffix>/<X_var_2d>
+_ID_SUFFIX_CONTEXTS = ('stmt', 'arg', 'index', 'from', 'to', 'step')
+_ID_SUFFIX_NTS = frozenset(f'<{c}_id_suffix>' for c in _ID_SUFFIX_CONTEXTS)
+_VAR_2D_NTS = frozenset(f'<{c}_var_2d>' for c in _ID_SUFFIX_CONTEXTS)
+
+# Second-token lookaheads that select <assignment_statement> from <statement>
+_ASSIGN_LOOKAHEAD = frozenset({
+    '=', '+=', '-=', '*=', '/=', '//=', '%=', '**=', '++', '--', '[', '.',
+})
+
+# Pre-formatted expected list for a bad token after a statement identifier
+_STATEMENT_LOOKAHEAD_EXPECTED = 'Expected: ' + ', '.join(
+    f"'{e}'" for e in sorted(_ASSIGN_LOOKAHEAD | {'(', 'identifier'}))
+
+# Parse loop guard: iterations allowed per input token, and at least
+# _MIN_PARSE_STEPS in total
+_PARSE_STEPS_PER_TOKEN = 100
+_MIN_PARSE_STEPS = 200000
+
+
+# Built-in datatype keywords, in grammar order
+_DATATYPES = ('num', 'decimal', 'bigdecimal', 'bool', 'text', 'letter')
+
+
+def _typed_decl(value_nt):
+    """`<type> identifier = <value> ;` alternatives, one per datatype"""
+    return [[dt, 'identifier', '=', value_nt, ';'] for dt in _DATATYPES]
+
+
+def _id_suffix_rules(prefix):
+    """Productions for what may follow an identifier inside an expression.
+
+    Covers a call, a 1D/2D index and member access. Each expression
+    context gets its own copy, again so its FOLLOW sets stay separate.
+    """
+    p = prefix
+    return {
+        f'<{p}_id_suffix>': [
+            ['(', '<arg_list>', ')'],
+            ['[', '<index_value>', ']', f'<{p}_var_2d>'],
+            ['.', 'identifier'],
+            ['λ']
+        ],
+
+        f'<{p}_var_2d>': [
+            ['[', '<index_value>', ']'],
+            ['.', 'identifier'],
+            ['λ']
+        ],
+    }
+
+
+def _expression_cascade(prefix):
+    """Productions for one full expression precedence cascade.
+
+    Statement values and argument values use the same operator cascade
+    (or → and → eq → rel → add → mult → exp → unary → prim). They are
+    kept as separate non-terminals so each context keeps its own FOLLOW
+    sets, and with them its own expected-token error messages.
+    """
+    p = prefix
+    return {
+        f'<{p}_value>': [[f'<{p}_or>']],
+
+        f'<{p}_or>': [[f'<{p}_and>', f'<{p}_or_tail>']],
+        f'<{p}_or_tail>': [
+            ['||', f'<{p}_and>', f'<{p}_or_tail>'],
+            ['λ']
+        ],
+
+        f'<{p}_and>': [[f'<{p}_eq>', f'<{p}_and_tail>']],
+        f'<{p}_and_tail>': [
+            ['&&', f'<{p}_eq>', f'<{p}_and_tail>'],
+            ['λ']
+        ],
+
+        f'<{p}_eq>': [[f'<{p}_rel>', f'<{p}_eq_tail>']],
+        f'<{p}_eq_tail>': [
+            ['==', f'<{p}_rel>', f'<{p}_eq_tail>'],
+            ['!=', f'<{p}_rel>', f'<{p}_eq_tail>'],
+            ['λ']
+        ],
+
+        f'<{p}_rel>': [[f'<{p}_add>', f'<{p}_rel_tail>']],
+        f'<{p}_rel_tail>': [
+            ['>', f'<{p}_add>', f'<{p}_rel_tail>'],
+            ['<', f'<{p}_add>', f'<{p}_rel_tail>'],
+            ['>=', f'<{p}_add>', f'<{p}_rel_tail>'],
+            ['<=', f'<{p}_add>', f'<{p}_rel_tail>'],
+            ['λ']
+        ],
+
+        f'<{p}_add>': [[f'<{p}_mult>', f'<{p}_add_tail>']],
+        f'<{p}_add_tail>': [
+            ['+', f'<{p}_mult>', f'<{p}_add_tail>'],
+            ['-', f'<{p}_mult>', f'<{p}_add_tail>'],
+            ['λ']
+        ],
+
+        f'<{p}_mult>': [[f'<{p}_exp>', f'<{p}_mult_tail>']],
+        f'<{p}_mult_tail>': [
+            ['*', f'<{p}_exp>', f'<{p}_mult_tail>'],
+            ['/', f'<{p}_exp>', f'<{p}_mult_tail>'],
+            ['//', f'<{p}_exp>', f'<{p}_mult_tail>'],
+            ['%', f'<{p}_exp>', f'<{p}_mult_tail>'],
+            ['λ']
+        ],
+
+        f'<{p}_exp>': [[f'<{p}_unary>', f'<{p}_exp_tail>']],
+        f'<{p}_exp_tail>': [
+            ['**', f'<{p}_exp>'],
+            ['λ']
+        ],
+
+        f'<{p}_unary>': [
+            ['-', f'<{p}_post>'],
+            ['!', f'<{p}_post>'],
+            [f'<{p}_post>']
+        ],
+
+        f'<{p}_post>': [[f'<{p}_prim>']],
+
+        f'<{p}_prim>': [
+            ['(', f'<{p}_value>', ')'],
+            ['<literal>'],
+            ['identifier', f'<{p}_id_suffix>'],
+            ['<size_call>'],
+            ['<textlen_call>'],
+            ['<charat_call>'],
+            ['<ord_call>']
+        ],
+
+        **_id_suffix_rules(p),
+    }
+
+
+def _strongly_connected_components(deps):
+    """Tarjan's strongly connected components of a dependency graph.
+
+    deps[v] is the set of vertices v depends on. Components are returned
+    dependencies-first: each comes after every component it depends on.
+    """
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+
+    def visit(v):
+        index[v] = low[v] = len(index)
+        stack.append(v)
+        on_stack.add(v)
+        for w in deps[v]:
+            if w not in index:
+                visit(w)
+                low[v] = min(low[v], low[w])
+            elif w in on_stack:
+                low[v] = min(low[v], index[w])
+        if low[v] == index[v]:
+            component = []
+            while True:
+                w = stack.pop()
+                on_stack.discard(w)
+                component.append(w)
+                if w == v:
+                    break
+            components.append(component)
+
+    for v in range(len(deps)):
+        if v not in index:
+            visit(v)
+    return components
+
 
 class TableDrivenParser:
-    def __init__(self, tokens):
+    # Per-parse state only; everything grammar-derived is a class attribute
+    __slots__ = ('tokens', 'pos', 'token_types', 'token_ids',
+                 'stack', 'sp', 'sem_stack', 'skipped_expected',
+                 'record_derivations', 'derivations')
+
+    # The grammar, FIRST/FOLLOW sets, LL(1) table and action registry do
+    # not depend on the input: they are built once, on an unslotted
+    # _GrammarBuilder, and published as class attributes shared by every
+    # parser.
+    _grammar_ready = False
+
+    def __init__(self, tokens, record_derivations=False):
         """Initialize parser with token stream"""
-        self.tokens = tokens
+        if not TableDrivenParser._grammar_ready:
+            builder = object.__new__(_GrammarBuilder)
+            builder._build_grammar()
+            for name, value in vars(builder).items():
+                # Shared by every parser: publish the sequence tables
+                # (predict, prod_*, FIRST/FOLLOW, ...) as tuples
+                if type(value) is list:
+                    value = tuple(value)
+                setattr(TableDrivenParser, name, value)
+            TableDrivenParser._grammar_ready = True
+
+        # The input always ends in a '$' sentinel token, so reading the
+        # current or next token never needs an end-of-input check.
+        self.tokens = list(tokens)
+        self.tokens.append(_EOF_TOKEN)
         self.pos = 0
-        self.current_token = tokens[0] if tokens else None
+        # Parallel list of grammar symbols, one per token, so the parse
+        # loop never touches Token objects.
+        self.token_types = [self._token_type(t) for t in self.tokens]
+        # Same stream as symbol ids, resolved once for the parse loop
+        sid = self.symbol_id
+        unknown_id = self.unknown_id
+        self.token_ids = [sid.get(t, unknown_id) for t in self.token_types]
+
+        # Preallocated parse stack; self.sp counts the live entries
+        # (parse() works on a local copy and stores it back on exit)
+        self.stack = [None] * 1024
+        self.stack[0] = sid['$']
+        if record_derivations:
+            self.stack[1] = sid['<program>']
+        else:
+            self.stack[1] = self.start_id
+        self.sp = 2
+        # Applied production indices, only kept when asked for
+        self.record_derivations = record_derivations
+        self.derivations = array('i')
+        # Bitmask of terminals whose alternatives were passed over by λ
+        # expansions since the last match; they are valid in error text
+        self.skipped_expected = 0
 
+        # Semantic stack for AST construction
+        self.sem_stack = []
+
+    def _build_grammar(self):
+        """Build all grammar-derived tables (independent of the tokens)"""
         self._init_grammar()
+        self._build_symbol_ids()
         self._compute_first_sets()
         self._compute_follow_sets()
         self._build_parsing_table()
-
-        self.stack = ['$', '<program>']
-        self.derivations = []
-        self.skipped_expected = set()
-
-        # Semantic stack for AST construction
-        self.sem_stack = []
         self._build_action_registry()
+        self._build_predict_table()
 
     def _init_grammar(self):
         """Defining the 289 CFG Productions"""
@@ -86,14 +383,7 @@ class TableDrivenParser:
 
             # DATATYPES
 
-            '<datatype>': [
-                ['num'],
-                ['decimal'],
-                ['bigdecimal'],
-                ['bool'],
-                ['text'],
-                ['letter']
-            ],
+            '<datatype>': [[dt] for dt in _DATATYPES],
 
             # GLOBAL DECLARATIONS
 
@@ -111,14 +401,7 @@ class TableDrivenParser:
                 ['λ']
             ],
 
-            '<global_typed_decl>': [
-                ['num', 'identifier', '=', '<stmt_value>', ';'],
-                ['decimal', 'identifier', '=', '<stmt_value>', ';'],
-                ['bigdecimal', 'identifier', '=', '<stmt_value>', ';'],
-                ['bool', 'identifier', '=', '<stmt_value>', ';'],
-                ['text', 'identifier', '=', '<stmt_value>', ';'],
-                ['letter', 'identifier', '=', '<stmt_value>', ';']
-            ],
+            '<global_typed_decl>': _typed_decl('<stmt_value>'),
 
             # FUNCTION DEFINITIONS
 
@@ -127,15 +410,7 @@ class TableDrivenParser:
                  '{', '<local_declarations>', '<statements>', '<optional_return>', '}']
             ],
 
-            '<return_type>': [
-                ['num'],
-                ['decimal'],
-                ['bigdecimal'],
-                ['bool'],
-                ['text'],
-                ['letter'],
-                ['empty']
-            ],
+            '<return_type>': [[dt] for dt in _DATATYPES] + [['empty']],
 
             '<parameter_list>': [
                 ['<parameter>', '<parameter_list_tail>'],
@@ -177,38 +452,21 @@ class TableDrivenParser:
 
             '<local_declaration>': [
                 ['identifier', 'identifier', ';'],
-                ['num', 'identifier', '=', '<stmt_value>', ';'],
-                ['decimal', 'identifier', '=', '<stmt_value>', ';'],
-                ['bigdecimal', 'identifier', '=', '<stmt_value>', ';'],
-                ['bool', 'identifier', '=', '<stmt_value>', ';'],
-                ['text', 'identifier', '=', '<stmt_value>', ';'],
-                ['letter', 'identifier', '=', '<stmt_value>', ';']
+                *_typed_decl('<stmt_value>')
             ],
 
             '<fixed_declaration>': [
                 ['fixed', '<fixed_typed_decl>']
             ],
 
-            '<fixed_typed_decl>': [
-                ['num', 'identifier', '=', '<stmt_value>', ';'],
-                ['decimal', 'identifier', '=', '<stmt_value>', ';'],
-                ['bigdecimal', 'identifier', '=', '<stmt_value>', ';'],
-                ['bool', 'identifier', '=', '<stmt_value>', ';'],
-                ['text', 'identifier', '=', '<stmt_value>', ';'],
-                ['letter', 'identifier', '=', '<stmt_value>', ';']
-            ],
+            '<fixed_typed_decl>': _typed_decl('<stmt_value>'),
 
             '<list_declaration>': [
                 ['list', '<list_typed_decl>']
             ],
 
             '<list_typed_decl>': [
-                ['num', 'identifier', '=', '<val_list>', ';'],
-                ['decimal', 'identifier', '=', '<val_list>', ';'],
-                ['bigdecimal', 'identifier', '=', '<val_list>', ';'],
-                ['bool', 'identifier', '=', '<val_list>', ';'],
-                ['text', 'identifier', '=', '<val_list>', ';'],
-                ['letter', 'identifier', '=', '<val_list>', ';'],
+                *_typed_decl('<val_list>'),
                 ['identifier', 'identifier', '=', 'num_lit', ';'],
             ],
 
@@ -410,176 +668,11 @@ class TableDrivenParser:
                 ['No']
             ],
 
+            # EXPRESSIONS
 
+            **_expression_cascade('stmt'),
 
-            '<stmt_value>': [['<stmt_or>']],
-
-            '<stmt_or>': [['<stmt_and>', '<stmt_or_tail>']],
-            '<stmt_or_tail>': [
-                ['||', '<stmt_and>', '<stmt_or_tail>'],
-                ['λ']
-            ],
-
-            '<stmt_and>': [['<stmt_eq>', '<stmt_and_tail>']],
-            '<stmt_and_tail>': [
-                ['&&', '<stmt_eq>', '<stmt_and_tail>'],
-                ['λ']
-            ],
-
-            '<stmt_eq>': [['<stmt_rel>', '<stmt_eq_tail>']],
-            '<stmt_eq_tail>': [
-                ['==', '<stmt_rel>', '<stmt_eq_tail>'],
-                ['!=', '<stmt_rel>', '<stmt_eq_tail>'],
-                ['λ']
-            ],
-
-            '<stmt_rel>': [['<stmt_add>', '<stmt_rel_tail>']],
-            '<stmt_rel_tail>': [
-                ['>', '<stmt_add>', '<stmt_rel_tail>'],
-                ['<', '<stmt_add>', '<stmt_rel_tail>'],
-                ['>=', '<stmt_add>', '<stmt_rel_tail>'],
-                ['<=', '<stmt_add>', '<stmt_rel_tail>'],
-                ['λ']
-            ],
-
-            '<stmt_add>': [['<stmt_mult>', '<stmt_add_tail>']],
-            '<stmt_add_tail>': [
-                ['+', '<stmt_mult>', '<stmt_add_tail>'],
-                ['-', '<stmt_mult>', '<stmt_add_tail>'],
-                ['λ']
-            ],
-
-            '<stmt_mult>': [['<stmt_exp>', '<stmt_mult_tail>']],
-            '<stmt_mult_tail>': [
-                ['*', '<stmt_exp>', '<stmt_mult_tail>'],
-                ['/', '<stmt_exp>', '<stmt_mult_tail>'],
-                ['//', '<stmt_exp>', '<stmt_mult_tail>'],
-                ['%', '<stmt_exp>', '<stmt_mult_tail>'],
-                ['λ']
-            ],
-
-            '<stmt_exp>': [['<stmt_unary>', '<stmt_exp_tail>']],
-            '<stmt_exp_tail>': [
-                ['**', '<stmt_exp>'],
-                ['λ']
-            ],
-
-            '<stmt_unary>': [
-                ['-', '<stmt_post>'],
-                ['!', '<stmt_post>'],
-                ['<stmt_post>']
-            ],
-
-
-            '<stmt_post>': [['<stmt_prim>']],
-
-            '<stmt_prim>': [
-                ['(', '<stmt_value>', ')'],
-                ['<literal>'],
-                ['identifier', '<stmt_id_suffix>'],
-                ['<size_call>'],
-                ['<textlen_call>'],
-                ['<charat_call>'],
-                ['<ord_call>']
-            ],
-
-            '<stmt_id_suffix>': [
-                ['(', '<arg_list>', ')'],
-                ['[', '<index_value>', ']', '<stmt_var_2d>'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
-
-            '<stmt_var_2d>': [
-                ['[', '<index_value>', ']'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
-
-
-
-            '<arg_value>': [['<arg_or>']],
-
-            '<arg_or>': [['<arg_and>', '<arg_or_tail>']],
-            '<arg_or_tail>': [
-                ['||', '<arg_and>', '<arg_or_tail>'],
-                ['λ']
-            ],
-
-            '<arg_and>': [['<arg_eq>', '<arg_and_tail>']],
-            '<arg_and_tail>': [
-                ['&&', '<arg_eq>', '<arg_and_tail>'],
-                ['λ']
-            ],
-
-            '<arg_eq>': [['<arg_rel>', '<arg_eq_tail>']],
-            '<arg_eq_tail>': [
-                ['==', '<arg_rel>', '<arg_eq_tail>'],
-                ['!=', '<arg_rel>', '<arg_eq_tail>'],
-                ['λ']
-            ],
-
-            '<arg_rel>': [['<arg_add>', '<arg_rel_tail>']],
-            '<arg_rel_tail>': [
-                ['>', '<arg_add>', '<arg_rel_tail>'],
-                ['<', '<arg_add>', '<arg_rel_tail>'],
-                ['>=', '<arg_add>', '<arg_rel_tail>'],
-                ['<=', '<arg_add>', '<arg_rel_tail>'],
-                ['λ']
-            ],
-
-            '<arg_add>': [['<arg_mult>', '<arg_add_tail>']],
-            '<arg_add_tail>': [
-                ['+', '<arg_mult>', '<arg_add_tail>'],
-                ['-', '<arg_mult>', '<arg_add_tail>'],
-                ['λ']
-            ],
-
-            '<arg_mult>': [['<arg_exp>', '<arg_mult_tail>']],
-            '<arg_mult_tail>': [
-                ['*', '<arg_exp>', '<arg_mult_tail>'],
-                ['/', '<arg_exp>', '<arg_mult_tail>'],
-                ['//', '<arg_exp>', '<arg_mult_tail>'],
-                ['%', '<arg_exp>', '<arg_mult_tail>'],
-                ['λ']
-            ],
-
-            '<arg_exp>': [['<arg_unary>', '<arg_exp_tail>']],
-            '<arg_exp_tail>': [
-                ['**', '<arg_exp>'],
-                ['λ']
-            ],
-
-            '<arg_unary>': [
-                ['-', '<arg_post>'],
-                ['!', '<arg_post>'],
-                ['<arg_post>']
-            ],
-
-            '<arg_post>': [['<arg_prim>']],
-
-            '<arg_prim>': [
-                ['(', '<arg_value>', ')'],
-                ['<literal>'],
-                ['identifier', '<arg_id_suffix>'],
-                ['<size_call>'],
-                ['<textlen_call>'],
-                ['<charat_call>'],
-                ['<ord_call>']
-            ],
-
-            '<arg_id_suffix>': [
-                ['(', '<arg_list>', ')'],
-                ['[', '<index_value>', ']', '<arg_var_2d>'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
-
-            '<arg_var_2d>': [
-                ['[', '<index_value>', ']'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
+            **_expression_cascade('arg'),
 
 
 
@@ -629,18 +722,7 @@ class TableDrivenParser:
                 ['<ord_call>']
             ],
 
-            '<index_id_suffix>': [
-                ['(', '<arg_list>', ')'],
-                ['[', '<index_value>', ']', '<index_var_2d>'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
-
-            '<index_var_2d>': [
-                ['[', '<index_value>', ']'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
+            **_id_suffix_rules('index'),
 
 
 
@@ -654,18 +736,7 @@ class TableDrivenParser:
                 ['<ord_call>']
             ],
 
-            '<from_id_suffix>': [
-                ['(', '<arg_list>', ')'],
-                ['[', '<index_value>', ']', '<from_var_2d>'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
-
-            '<from_var_2d>': [
-                ['[', '<index_value>', ']'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
+            **_id_suffix_rules('from'),
 
 
             '<to_primary>': [
@@ -678,18 +749,7 @@ class TableDrivenParser:
                 ['<ord_call>']
             ],
 
-            '<to_id_suffix>': [
-                ['(', '<arg_list>', ')'],
-                ['[', '<index_value>', ']', '<to_var_2d>'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
-
-            '<to_var_2d>': [
-                ['[', '<index_value>', ']'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
+            **_id_suffix_rules('to'),
 
 
 
@@ -703,18 +763,7 @@ class TableDrivenParser:
                 ['<ord_call>']
             ],
 
-            '<step_id_suffix>': [
-                ['(', '<arg_list>', ')'],
-                ['[', '<index_value>', ']', '<step_var_2d>'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
-
-            '<step_var_2d>': [
-                ['[', '<index_value>', ']'],
-                ['.', 'identifier'],
-                ['λ']
-            ],
+            **_id_suffix_rules('step'),
 
 
 
@@ -740,248 +789,286 @@ class TableDrivenParser:
             ],
         }
 
-        self.non_terminals = set(self.productions.keys())
-        self.terminals = self._extract_terminals()
-
-    def _extract_terminals(self):
-        """Extract all terminals from productions"""
-        terminals = set()
+        # A rule not reachable from <program> is a grammar editing
+        # mistake, so it is reported rather than given dead table rows.
+        reachable = {'<program>'}
+        pending = ['<program>']
+        while pending:
+            for prod in self.productions[pending.pop()]:
+                for sym in prod:
+                    if sym in self.productions and sym not in reachable:
+                        reachable.add(sym)
+                        pending.append(sym)
+        unreachable = [nt for nt in self.productions if nt not in reachable]
+        if unreachable:
+            raise ValueError(
+                "Unreachable grammar rules: " + ', '.join(unreachable))
+
+        # Freeze each alternative as a tuple of interned symbols so table
+        # entries and action keys share one immutable object per production.
+        # Identical alternatives (('λ',) above all) share a single tuple.
+        # Terminals are collected on the same pass over the symbols.
+        intern = sys.intern
+        shared = {}
+        symbols = set()
+        productions = {}
+        for nt, prods in self.productions.items():
+            alts = []
+            for prod in prods:
+                rhs = tuple(intern(sym) for sym in prod)
+                symbols.update(rhs)
+                alts.append(shared.setdefault(rhs, rhs))
+            productions[intern(nt)] = tuple(alts)
+        self.productions = productions
+
+        self.non_terminals = frozenset(productions)
+        symbols -= self.non_terminals
+        symbols.discard('λ')
+        symbols.add('$')
+        self.terminals = frozenset(symbols)
+
+    def _build_symbol_ids(self):
+        """Index symbols and productions by small ints.
+
+        Non-terminals take ids 0..n_nt-1, so `sym < n_nt` classifies a
+        stack symbol. Terminals, '$' and 'λ' follow. FIRST/FOLLOW sets are
+        bitmasks over these ids, and the parse loop runs on them.
+        """
+        names = list(self.productions) + sorted(self.terminals) + ['λ']
+        self.symbols = names
+        self.symbol_id = sid = {name: i for i, name in enumerate(names)}
+        self.n_nt = len(self.productions)
+        self.unknown_id = len(names)
+        self.epsilon_bit = 1 << sid['λ']
+        self.semantic_ids = frozenset(
+            sid[t] for t in _SEMANTIC_TERMINALS if t in sid)
+
+        self.prod_lhs = []
+        self.prod_rhs = []
+        self.prod_symbols = []
+        self.prod_index = {}
         for nt, prods in self.productions.items():
             for prod in prods:
-                for symbol in prod:
-                    if symbol not in self.non_terminals and symbol != 'λ':
-                        terminals.add(symbol)
-        terminals.add('$')
-        return terminals
+                self.prod_index[(nt, prod)] = len(self.prod_rhs)
+                self.prod_lhs.append(sid[nt])
+                # λ alternatives get an empty id sequence: nothing to push
+                self.prod_rhs.append(
+                    tuple(sid[sym] for sym in prod if sym != 'λ'))
+                self.prod_symbols.append(prod)
+
+    def _mask_symbols(self, mask):
+        """Yield the symbol names whose bits are set in mask"""
+        names = self.symbols
+        while mask:
+            low = mask & -mask
+            yield names[low.bit_length() - 1]
+            mask ^= low
 
     def _compute_first_sets(self):
         """Compute FIRST sets for all non-terminals"""
-        self.first = {nt: set() for nt in self.non_terminals}
-
-        changed = True
-        while changed:
-            changed = False
-            for nt in self.non_terminals:
-                for production in self.productions[nt]:
-                    old_size = len(self.first[nt])
-                    first_of_prod = self._first_of_sequence(production)
-                    self.first[nt].update(first_of_prod)
-                    if len(self.first[nt]) > old_size:
-                        changed = True
+        n_nt = self.n_nt
+        self.first = first = [0] * n_nt
+
+        # FIRST(A) depends on every non-terminal in A's alternatives
+        rhs_of = [[] for _ in range(n_nt)]
+        deps = [set() for _ in range(n_nt)]
+        for nt, rhs in zip(self.prod_lhs, self.prod_rhs):
+            rhs_of[nt].append(rhs)
+            deps[nt].update(sym for sym in rhs if sym < n_nt)
+
+        # Dependencies are final before their dependents are visited, so
+        # only recursive components need iterating to a fixed point
+        for component in _strongly_connected_components(deps):
+            recursive = len(component) > 1 or component[0] in deps[component[0]]
+            changed = True
+            while changed:
+                changed = False
+                for nt in component:
+                    new = first[nt]
+                    for rhs in rhs_of[nt]:
+                        new |= self._first_of_sequence(rhs)
+                    if new != first[nt]:
+                        first[nt] = new
+                        changed = recursive
 
     def _first_of_sequence(self, sequence):
-        """Compute FIRST of a sequence of symbols"""
-        result = set()
+        """Compute FIRST of a sequence of symbol ids as a bitmask"""
+        n_nt = self.n_nt
+        eps = self.epsilon_bit
+        result = 0
         for symbol in sequence:
-            if symbol == 'λ':
-                result.add('λ')
-                break
-            elif symbol in self.terminals:
-                result.add(symbol)
-                break
-            else:
-                result.update(self.first[symbol] - {'λ'})
-                if 'λ' not in self.first[symbol]:
-                    break
-        else:
-            result.add('λ')
-        return result
+            if symbol >= n_nt:
+                # Terminal, '$' or 'λ' (whose bit is the epsilon bit)
+                return result | (1 << symbol)
+            first = self.first[symbol]
+            result |= first & ~eps
+            if not first & eps:
+                return result
+        return result | eps
 
     def _compute_follow_sets(self):
         """Compute FOLLOW sets for all non-terminals"""
-        self.follow = {nt: set() for nt in self.non_terminals}
-        self.follow['<program>'].add('$')
-
-        changed = True
-        while changed:
-            changed = False
-            for nt in self.non_terminals:
-                for production in self.productions[nt]:
-                    for i, symbol in enumerate(production):
-                        if symbol in self.non_terminals:
-                            old_size = len(self.follow[symbol])
-                            rest = production[i+1:]
-                            if rest:
-                                first_of_rest = self._first_of_sequence(rest)
-                                self.follow[symbol].update(
-                                    first_of_rest - {'λ'})
-                                if 'λ' in first_of_rest:
-                                    self.follow[symbol].update(self.follow[nt])
-                            else:
-                                self.follow[symbol].update(self.follow[nt])
-                            if len(self.follow[symbol]) > old_size:
-                                changed = True
+        n_nt = self.n_nt
+        eps = self.epsilon_bit
+        sid = self.symbol_id
+        self.follow = follow = [0] * n_nt
+
+        # FOLLOW(B) = the FIRST sets of whatever follows B (fixed once
+        # FIRST is known) plus FOLLOW(A) wherever B ends A's alternative
+        # up to a nullable suffix
+        direct = [0] * n_nt
+        direct[sid['<program>']] = 1 << sid['$']
+        deps = [set() for _ in range(n_nt)]
+        first = self.first
+        # prod_first[p]: FIRST of production p, reused by the LL(1) table
+        self.prod_first = prod_first = []
+        for nt, rhs in zip(self.prod_lhs, self.prod_rhs):
+            # Walk right to left, keeping FIRST of the suffix after symbol
+            first_of_rest = eps
+            for symbol in reversed(rhs):
+                if symbol >= n_nt:
+                    first_of_rest = 1 << symbol
+                    continue
+                direct[symbol] |= first_of_rest & ~eps
+                if first_of_rest & eps:
+                    deps[symbol].add(nt)
+                if first[symbol] & eps:
+                    first_of_rest |= first[symbol] & ~eps
+                else:
+                    first_of_rest = first[symbol]
+            prod_first.append(first_of_rest)
+
+        for component in _strongly_connected_components(deps):
+            recursive = len(component) > 1 or component[0] in deps[component[0]]
+            changed = True
+            while changed:
+                changed = False
+                for symbol in component:
+                    new = direct[symbol]
+                    for nt in deps[symbol]:
+                        new |= follow[nt]
+                    if new != follow[symbol]:
+                        follow[symbol] = new
+                        changed = recursive
 
     def _build_parsing_table(self):
         """Build LL(1) parsing table"""
         self.table = {}
         self.conflicts = []
-
-        for nt in self.non_terminals:
-            for production in self.productions[nt]:
-                first_of_prod = self._first_of_sequence(production)
-
-                # Add entries for terminals in FIRST
-                for terminal in first_of_prod - {'λ'}:
-                    key = (nt, terminal)
-                    if key in self.table:
-                        self.conflicts.append({
-                            'key': key,
-                            'existing': self.table[key],
-                            'new': production
-                        })
-                    self.table[key] = production
-
-                # If λ in FIRST, add entries for FOLLOW
-                if 'λ' in first_of_prod:
-                    for terminal in self.follow[nt]:
-                        key = (nt, terminal)
-                        if key in self.table:
-                            self.conflicts.append({
-                                'key': key,
-                                'existing': self.table[key],
-                                'new': production
-                            })
-                        self.table[key] = production
+        eps = self.epsilon_bit
+
+        for lhs, production, first_of_prod in zip(
+                self.prod_lhs, self.prod_symbols, self.prod_first):
+            nt = self.symbols[lhs]
+
+            # Add entries for terminals in FIRST
+            terminals = list(self._mask_symbols(first_of_prod & ~eps))
+            # If λ in FIRST, add entries for FOLLOW
+            if first_of_prod & eps:
+                terminals.extend(self._mask_symbols(self.follow[lhs]))
+
+            for terminal in terminals:
+                key = (nt, terminal)
+                if key in self.table:
+                    self.conflicts.append({
+                        'key': key,
+                        'existing': self.table[key],
+                        'new': production
+                    })
+                self.table[key] = production
+
+    def _build_predict_table(self):
+        """Dense integer form of self.table for the parse loop.
+
+        `predict` is one flat row-major list with a row per non-terminal
+        and a column per terminal id (t - n_nt). Each cell holds a
+        production index, or -1 where self.table has no entry. One extra
+        column catches token types the grammar never mentions.
+        """
+        sid = self.symbol_id
+        prod_index = self.prod_index
+        self.prod_action = [
+            self.production_actions.get((self.symbols[nt], prod),
+                                        'PASS_THROUGH')
+            for nt, prod in zip(self.prod_lhs, self.prod_symbols)]
+
+        n_nt = self.n_nt
+        self.predict_width = width = len(self.symbols) - n_nt + 1
+        self.predict = predict = [-1] * (n_nt * width)
+        # row_mask[nt]: bitmask of terminals with an entry in nt's row
+        self.row_mask = row_mask = [0] * n_nt
+        for (nt, terminal), prod in self.table.items():
+            cell = sid[nt] * width + sid[terminal] - n_nt
+            predict[cell] = prod_index[(nt, prod)]
+            row_mask[sid[nt]] |= 1 << sid[terminal]
+
+        # Unit non-terminals (one alternative, a single non-terminal,
+        # no action) are never pushed: references to them are replaced
+        # by the non-terminal they expand to. The row mask check keeps
+        # syntax errors reporting the same expected set.
+        alias = {}
+        for nt, alts in self.productions.items():
+            if len(alts) != 1 or len(alts[0]) != 1:
+                continue
+            target = alts[0][0]
+            if (target in self.productions
+                    and self.prod_action[prod_index[(nt, alts[0])]]
+                    == 'PASS_THROUGH'
+                    and row_mask[sid[nt]] == row_mask[sid[target]]):
+                alias[sid[nt]] = sid[target]
+        for nt in alias:
+            target = alias[nt]
+            while target in alias:
+                target = alias[target]
+            alias[nt] = target
+        # prod_push: right-hand sides as pushed by the parse loop,
+        # already reversed so the first symbol ends up on top
+        self.prod_push = [tuple(alias.get(s, s) for s in reversed(rhs))
+                          for rhs in self.prod_rhs]
+        self.start_id = alias.get(sid['<program>'], sid['<program>'])
+        # Without aliases resolved, for parses that record derivations:
+        # every unit step then stays in the leftmost derivation
+        self.prod_push_units = [tuple(reversed(rhs)) for rhs in self.prod_rhs]
+
+        # Two-token lookahead cells. The LL(1) cell holds -2 - k, where
+        # lookahead2[k] is a row indexed like predict by the next token.
+        # <statement> on an identifier: assignment, call or declaration
+        stmt_row = [-1] * width
+        for terminal in _ASSIGN_LOOKAHEAD:
+            stmt_row[sid[terminal] - n_nt] = prod_index[
+                ('<statement>', ('<assignment_statement>',))]
+        stmt_row[sid['('] - n_nt] = prod_index[
+            ('<statement>', ('<function_call_statement>',))]
+        stmt_row[sid['identifier'] - n_nt] = prod_index[
+            ('<statement>', ('<declaration>',))]
+        # <val_list> on '[': a second '[' starts a 2D list
+        list_row = [prod_index[('<val_list>', ('<val_list_1d>',))]] * width
+        list_row[sid['['] - n_nt] = prod_index[
+            ('<val_list>', ('<val_list_2d>',))]
+        self.lookahead2 = [tuple(stmt_row), tuple(list_row)]
+        predict[sid['<statement>'] * width + sid['identifier'] - n_nt] = -2
+        predict[sid['<val_list>'] * width + sid['['] - n_nt] = -3
 
     # ══════════════════════════════════════════════════════════════
-    # ACTION REGISTRY — maps (NT, production_tuple) to action name
+    # TOKEN LOCATION HELPER
     # ══════════════════════════════════════════════════════════════
 
-    def _build_action_registry(self):
-        """Classify all productions into action categories."""
-        self.production_actions = {}
-
-        # Sets of terminals that carry semantic value (pushed onto sem_stack)
-        self._semantic_terminals = {
-            'identifier', 'num_lit', 'decimal_lit', 'string_lit', 'char_lit',
-            'Yes', 'No',
-            # Operators
-            '+', '-', '*', '/', '//', '%', '**',
-            '||', '&&', '==', '!=', '>', '<', '>=', '<=',
-            '=', '+=', '-=', '*=', '/=', '//=', '%=', '**=', '++', '--',
-            '!',
-            # Type keywords (semantic value = the type itself)
-            'num', 'decimal', 'bigdecimal', 'bool', 'text', 'letter', 'empty',
-            # Keywords that carry semantic meaning
-            'fixed', 'stop', 'skip',
-        }
-
-        # NTs that are simple pass-through (single NT child)
-        pass_through_nts = {
-            '<program>', '<stmt_value>', '<arg_value>', '<cond_value>',
-            '<index_value>',
-            '<stmt_post>', '<arg_post>', '<index_post>',
-            '<control_statement>', '<iterative_statement>',
-            '<declaration>',
-            '<statement>',
-        }
-
-        # NTs for binary expression levels: <X> → <operand> <X_tail>
-        # These need FOLD_TAIL action
-        fold_tail_nts = {
-            '<stmt_or>', '<stmt_and>', '<stmt_eq>', '<stmt_rel>',
-            '<stmt_add>', '<stmt_mult>',
-            '<arg_or>', '<arg_and>', '<arg_eq>', '<arg_rel>',
-            '<arg_add>', '<arg_mult>',
-            '<index_add>', '<index_mult>',
-        }
-
-        # NTs for binary tails: <X_tail> → op <operand> <X_tail> | λ
-        build_tail_nts = {
-            '<stmt_or_tail>', '<stmt_and_tail>', '<stmt_eq_tail>',
-            '<stmt_rel_tail>', '<stmt_add_tail>', '<stmt_mult_tail>',
-            '<arg_or_tail>', '<arg_and_tail>', '<arg_eq_tail>',
-            '<arg_rel_tail>', '<arg_add_tail>', '<arg_mult_tail>',
-            '<index_add_tail>', '<index_mult_tail>',
-        }
-
-        # NTs for exponent: <X_exp> → <X_unary> <X_exp_tail>
-        fold_exp_nts = {
-            '<stmt_exp>', '<arg_exp>', '<index_exp>',
-        }
-
-        # NTs for exponent tails: <X_exp_tail> → ** <X_exp> | λ
-        build_exp_tail_nts = {
-            '<stmt_exp_tail>', '<arg_exp_tail>', '<index_exp_tail>',
-        }
-
-        # List-accumulator NTs (recursive: item rest → prepend item to rest)
-        list_accum_nts = {
-            '<statements>', '<option_statements>',
-            '<local_declarations>',
-            '<group_body>', '<group_body_tail>',
-            '<option_blocks>',
-            '<val_list_rows>', '<val_list_rows_tail>',
-        }
-
-        # List-tail NTs (comma-separated: , item rest → prepend item to rest)
-        list_tail_nts = {
-            '<parameter_list_tail>', '<arg_list_tail>',
-            '<val_list_tail>',
-        }
-
-        for nt, prods in self.productions.items():
-            for prod in prods:
-                key = (nt, tuple(prod))
-                is_epsilon = prod == ['λ']
-
-                # ── Epsilon productions ─────────────────────────
-                if is_epsilon:
-                    if nt in list_accum_nts or nt in list_tail_nts:
-                        self.production_actions[key] = 'EPSILON_LIST'
-                    elif nt in build_tail_nts or nt in build_exp_tail_nts:
-                        self.production_actions[key] = 'EPSILON_TAIL'
-                    else:
-                        self.production_actions[key] = 'EPSILON'
-                    continue
-
-                # ── Pass-through: single NT child ───────────────
-                if nt in pass_through_nts:
-                    self.production_actions[key] = 'PASS_THROUGH'
-                    continue
-
-                # ── Binary fold: <level> → <operand> <tail> ────
-                if nt in fold_tail_nts:
-                    self.production_actions[key] = 'FOLD_TAIL'
-                    continue
-
-                # ── Binary tail: op <operand> <tail> ────────────
-                if nt in build_tail_nts:
-                    self.production_actions[key] = 'BUILD_TAIL'
-                    continue
-
-                # ── Exponent fold: <exp> → <unary> <exp_tail> ──
-                if nt in fold_exp_nts:
-                    self.production_actions[key] = 'FOLD_EXP'
-                    continue
-
-                # ── Exponent tail: ** <exp> | λ ─────────────────
-                if nt in build_exp_tail_nts:
-                    self.production_actions[key] = 'BUILD_EXP_TAIL'
-                    continue
-
-                # ── List accumulators ───────────────────────────
-                if nt in list_accum_nts:
-                    self.production_actions[key] = 'COLLECT_LIST'
-                    continue
-
-                # ── List tails (comma-separated) ────────────────
-                if nt in list_tail_nts:
-                    self.production_actions[key] = 'COLLECT_LIST_TAIL'
-                    continue
+    @property
+    def current_token(self):
+        """Token at the current position (the '$' sentinel at the end)"""
+        return self.tokens[self.pos]
 
-                # ── Everything else: CUSTOM per NT ──────────────
-                self.production_actions[key] = f'CUSTOM_{nt}'
-
-    # ══════════════════════════════════════════════════════════════
-    # TOKEN LOCATION HELPER
-    # ══════════════════════════════════════════════════════════════
+    def _token_type(self, token):
+        """Grammar symbol for an input token."""
+        if hasattr(token, 'type'):
+            return token.type
+        return str(token)
 
     def _token_loc(self, token):
         """Extract (line, col) from a token."""
-        if token and hasattr(token, 'pos_start') and token.pos_start:
-            return token.pos_start.ln + 1, token.pos_start.col + 1
+        pos = getattr(token, 'pos_start', None)
+        if pos:
+            return pos.ln + 1, pos.col + 1
         return 0, 0
 
     # ══════════════════════════════════════════════════════════════
@@ -994,186 +1081,292 @@ class TableDrivenParser:
             print("\n" + "="*80)
             print("TABLE-DRIVEN LL(1) PARSER")
             print("="*80)
-
-        step = 1
-        while self.stack:
-            top = self.stack[-1]
-
-            if self.current_token is None:
-                current = '$'
-            elif hasattr(self.current_token, 'type'):
-                current = self.current_token.type
-            else:
-                current = str(self.current_token)
-
-            if verbose:
-                print(f"Step {step}: Stack top={top}, Input={current}")
+            return self._parse_verbose()
+        return self._parse_quiet()
+
+    def _parse_quiet(self):
+        """parse() without tracing; the loop used in normal runs.
+
+        Same algorithm as _parse_verbose; keep the two loops in step.
+        """
+        # Hot-loop attribute lookups bound to locals once
+        stack = self.stack
+        sp = self.sp
+        sem_stack = self.sem_stack
+        tokens = self.tokens
+        types = self.token_types
+        ids = self.token_ids
+        names = self.symbols
+        sid = self.symbol_id
+        n_nt = self.n_nt
+        predict = self.predict
+        width = self.predict_width
+        row_mask = self.row_mask
+        record = self.record_derivations
+        prod_push = self.prod_push_units if record else self.prod_push
+        prod_action = self.prod_action
+        semantic_ids = self.semantic_ids
+        derivations = self.derivations
+        end_id = sid['$']
+        lookahead2 = self.lookahead2
+
+        # The input symbol only changes on a terminal match, so it is
+        # read once per token rather than once per loop iteration. Its
+        # name (types[pos]) is only needed for output and errors. pos,
+        # sp and skipped_expected live in locals and are written back
+        # before returning or raising.
+        pos = self.pos
+        skipped = self.skipped_expected
+        cur = ids[pos]
+        # A well-formed table needs a bounded number of iterations per
+        # token, so the loop itself is the infinite-loop guard.
+        max_steps = max(_MIN_PARSE_STEPS,
+                        _PARSE_STEPS_PER_TOKEN * len(tokens))
+        for _ in range(max_steps):
+            top = stack[sp - 1]
 
             # ── Action marker processing ─────────────────────
-            if isinstance(top, tuple) and len(top) >= 4 and top[0] == '@POST':
-                self.stack.pop()
+            # ('@POST', nt, action, saved_depth) markers are the only
+            # tuples ever pushed onto the parse stack.
+            if type(top) is tuple:
+                sp -= 1
                 _, nt, action, saved_depth = top
                 self._execute_action(nt, action, saved_depth)
                 continue
 
-            # Case 1: Top is $
-            if top == '$':
-                if verbose:
-                    print("="*80)
-                    print("PARSING SUCCESSFUL!")
-                    print("="*80)
+            # Non-terminal: pick a production
+            if top < n_nt:
+                p = predict[top * width + cur - n_nt]
+                if p < 0:
+                    if p == -1:
+                        self.pos = pos
+                        self.sp = sp
+                        self.skipped_expected = skipped
+                        self._error_no_production(top)
+                    # Statement-level and list 1D/2D ambiguity: the cell
+                    # defers to a row indexed by the next token
+                    p = lookahead2[-2 - p][ids[pos + 1] - n_nt]
+                    if p < 0:
+                        self.pos = pos
+                        self.sp = sp
+                        self._error_statement_lookahead(types[pos + 1])
+                elif not prod_push[p]:
+                    # Track skipped alternatives when taking λ path
+                    skipped |= row_mask[top] & ~(1 << cur)
+
+                # ── Expand the production onto the parse stack ──
+                rhs = prod_push[p]
+                action = prod_action[p]
+
+                sp -= 1
+
+                if action == 'PASS_THROUGH':
+                    # Nothing runs after the children, so no marker
+                    n = len(rhs)
+                    if sp + n > len(stack):
+                        stack.extend([None] * len(stack))
+                    stack[sp:sp + n] = rhs
+                    sp += n
+                elif not rhs:
+                    # Epsilon: handle immediately
+                    self._execute_action(names[top], action, len(sem_stack))
+                else:
+                    # Push post-action marker BEFORE reversed production
+                    # (so it fires AFTER all children are processed)
+                    n = len(rhs) + 1
+                    if sp + n > len(stack):
+                        stack.extend([None] * len(stack))
+                    saved_depth = len(sem_stack)
+                    stack[sp] = ('@POST', names[top], action, saved_depth)
+                    stack[sp + 1:sp + n] = rhs
+                    sp += n
+
+                if record:
+                    derivations.append(p)
+
+            # Top is $
+            elif top == end_id:
+                self.pos = pos
+                self.sp = sp
                 # Return the AST (should be one Program node on sem_stack)
-                if self.sem_stack:
-                    return self.sem_stack[-1]
+                if sem_stack:
+                    return sem_stack[-1]
                 return True
 
-            # Case 2: Top is terminal
-            elif top in self.terminals:
-                if top == current:
-                    if verbose:
-                        print(f"  MATCH '{top}'")
-                    self.stack.pop()
+            # Terminal matching the input
+            elif top == cur:
+                sp -= 1
 
-                    # Push semantic terminal onto sem_stack
-                    if top in self._semantic_terminals:
-                        self.sem_stack.append(self.current_token)
+                # Push semantic terminal onto sem_stack
+                if top in semantic_ids:
+                    sem_stack.append(tokens[pos])
 
-                    self.advance()
-                    self.skipped_expected = set()
-                else:
-                    self._error(f"Unexpected: '{current}'\nExpected: '{top}'")
-
-            # Case 3: Top is λ
-            elif top == 'λ':
-                if verbose:
-                    print(f"  POP λ")
-                self.stack.pop()
-
-            # Case 4: Top is non-terminal
-            elif top in self.non_terminals:
-                production = None
-
-                # Special case: Statement-level ambiguity requires 2-token lookahead
-                if top == '<statement>' and current == 'identifier':
-                    next_token = None
-                    if self.pos + 1 < len(self.tokens):
-                        next_tok_obj = self.tokens[self.pos + 1]
-                        if hasattr(next_tok_obj, 'type'):
-                            next_token = next_tok_obj.type
-                        else:
-                            next_token = str(next_tok_obj)
-                    else:
-                        next_token = '$'
-
-                    if next_token in ['=', '+=', '-=', '*=', '/=', '//=', '%=', '**=', '++', '--', '[', '.']:
-                        production = ['<assignment_statement>']
-                    elif next_token == '(':
-                        production = ['<function_call_statement>']
-                    elif next_token == 'identifier':
-                        production = ['<declaration>']
-                    else:
-                        all_valid_tokens = set()
-                        all_valid_tokens.update(
-                            ['=', '+=', '-=', '*=', '/=', '//=', '%=', '**=', '++', '--', '[', '.'])
-                        all_valid_tokens.add('(')
-                        all_valid_tokens.add('identifier')
-                        exp_str = ', '.join(
-                            f"'{e}'" for e in sorted(all_valid_tokens))
-                        self._error(
-                            f"Unexpected: '{next_token}'\nExpected: {exp_str}")
-
-                    if verbose:
-                        prod_str = ' '.join(production)
-                        print(
-                            f"  EXPAND {top} → {prod_str} (2-token lookahead, next={next_token})")
-
-                # Special case: List 1D vs 2D disambiguation
-                elif top == '<val_list>' and current == '[':
-                    next_token = None
-                    if self.pos + 1 < len(self.tokens):
-                        next_tok_obj = self.tokens[self.pos + 1]
-                        if hasattr(next_tok_obj, 'type'):
-                            next_token = next_tok_obj.type
-                        else:
-                            next_token = str(next_tok_obj)
-                    else:
-                        next_token = '$'
+                # Next token; the stream ends with the '$' sentinel
+                pos += 1
+                cur = ids[pos]
+                skipped = 0
 
-                    if next_token == '[':
-                        production = ['<val_list_2d>']
-                    else:
-                        production = ['<val_list_1d>']
+            else:
+                self.pos = pos
+                self.sp = sp
+                self._error_expected_terminal(types[pos], names[top])
+
+        self.pos = pos
+        self.sp = sp
+        self._error("Parser exceeded maximum steps (possible infinite loop)")
+
+    def _parse_verbose(self):
+        """parse() with a printed trace of every step.
+
+        Same algorithm as _parse_quiet; keep the two loops in step.
+        """
+        # Hot-loop attribute lookups bound to locals once
+        stack = self.stack
+        sp = self.sp
+        sem_stack = self.sem_stack
+        tokens = self.tokens
+        types = self.token_types
+        ids = self.token_ids
+        names = self.symbols
+        sid = self.symbol_id
+        n_nt = self.n_nt
+        predict = self.predict
+        width = self.predict_width
+        row_mask = self.row_mask
+        record = self.record_derivations
+        prod_push = self.prod_push_units if record else self.prod_push
+        prod_symbols = self.prod_symbols
+        prod_action = self.prod_action
+        semantic_ids = self.semantic_ids
+        derivations = self.derivations
+        end_id = sid['$']
+        lookahead2 = self.lookahead2
+        val_list_id = sid['<val_list>']
 
-                    if verbose:
-                        prod_str = ' '.join(production)
-                        print(
-                            f"  EXPAND {top} → {prod_str} (2-token lookahead for list, next={next_token})")
+        step = 1
+        # The input symbol only changes on a terminal match, so it is
+        # read once per token rather than once per loop iteration. Its
+        # name (types[pos]) is only needed for output and errors. pos,
+        # sp and skipped_expected live in locals and are written back
+        # before returning or raising.
+        pos = self.pos
+        skipped = self.skipped_expected
+        cur = ids[pos]
+        # A well-formed table needs a bounded number of iterations per
+        # token, so the loop itself is the infinite-loop guard; step
+        # only numbers the trace.
+        max_steps = max(_MIN_PARSE_STEPS,
+                        _PARSE_STEPS_PER_TOKEN * len(tokens))
+        for _ in range(max_steps):
+            top = stack[sp - 1]
+
+            shown = top if type(top) is tuple else names[top]
+            print(f"Step {step}: Stack top={shown}, Input={types[pos]}")
+
+            # ── Action marker processing ─────────────────────
+            # ('@POST', nt, action, saved_depth) markers are the only
+            # tuples ever pushed onto the parse stack.
+            if type(top) is tuple:
+                sp -= 1
+                _, nt, action, saved_depth = top
+                self._execute_action(nt, action, saved_depth)
+                continue
 
+            # Non-terminal: pick a production
+            if top < n_nt:
+                p = predict[top * width + cur - n_nt]
+                if p < 0:
+                    if p == -1:
+                        self.pos = pos
+                        self.sp = sp
+                        self.skipped_expected = skipped
+                        self._error_no_production(top)
+                    # Statement-level and list 1D/2D ambiguity: the cell
+                    # defers to a row indexed by the next token
+                    p = lookahead2[-2 - p][ids[pos + 1] - n_nt]
+                    if p < 0:
+                        self.pos = pos
+                        self.sp = sp
+                        self._error_statement_lookahead(types[pos + 1])
+                    prod_str = ' '.join(prod_symbols[p])
+                    kind = ' for list' if top == val_list_id else ''
+                    print(f"  EXPAND {names[top]} → {prod_str} "
+                          f"(2-token lookahead{kind}, next={types[pos + 1]})")
                 else:
-                    # Normal LL(1) table lookup
-                    key = (top, current)
-                    if key in self.table:
-                        production = self.table[key]
-                        if verbose:
-                            prod_str = ' '.join(production)
-                            print(f"  EXPAND {top} → {prod_str}")
-
-                        # Track skipped alternatives when taking λ path
-                        if production == ['λ']:
-                            other_tokens = set(
-                                term for (nt_k, term) in self.table.keys() if nt_k == top and term != current)
-                            self.skipped_expected.update(other_tokens)
+                    prod_str = ' '.join(prod_symbols[p])
+                    print(f"  EXPAND {names[top]} → {prod_str}")
 
-                    else:
-                        expected = set(
-                            term for (nt_k, term) in self.table.keys() if nt_k == top)
-                        expected.update(self.skipped_expected)
-                        expected = sorted(expected)
-                        if expected:
-                            exp_str = ', '.join(f"'{e}'" for e in expected)
-                            self._error(
-                                f"Unexpected: '{current}'\nExpected: {exp_str}")
-                        else:
-                            self._error(
-                                f"Unexpected: '{current}'\nNo valid continuation for {top}")
+                    # Track skipped alternatives when taking λ path
+                    if not prod_push[p]:
+                        skipped |= row_mask[top] & ~(1 << cur)
 
                 # ── Expand the production onto the parse stack ──
-                if production is not None:
-                    action_key = (top, tuple(production))
-                    action = self.production_actions.get(
-                        action_key, 'PASS_THROUGH')
+                rhs = prod_push[p]
+                action = prod_action[p]
+
+                sp -= 1
+
+                if action == 'PASS_THROUGH':
+                    # Nothing runs after the children, so no marker
+                    n = len(rhs)
+                    if sp + n > len(stack):
+                        stack.extend([None] * len(stack))
+                    stack[sp:sp + n] = rhs
+                    sp += n
+                elif not rhs:
+                    # Epsilon: handle immediately
+                    self._execute_action(names[top], action, len(sem_stack))
+                else:
+                    # Push post-action marker BEFORE reversed production
+                    # (so it fires AFTER all children are processed)
+                    n = len(rhs) + 1
+                    if sp + n > len(stack):
+                        stack.extend([None] * len(stack))
+                    saved_depth = len(sem_stack)
+                    stack[sp] = ('@POST', names[top], action, saved_depth)
+                    stack[sp + 1:sp + n] = rhs
+                    sp += n
+
+                if record:
+                    derivations.append(p)
+
+            # Top is $
+            elif top == end_id:
+                print("="*80)
+                print("PARSING SUCCESSFUL!")
+                print("="*80)
+                self.pos = pos
+                self.sp = sp
+                # Return the AST (should be one Program node on sem_stack)
+                if sem_stack:
+                    return sem_stack[-1]
+                return True
 
-                    self.stack.pop()
+            # Terminal matching the input
+            elif top == cur:
+                print(f"  MATCH '{types[pos]}'")
+                sp -= 1
 
-                    if production == ['λ']:
-                        # Epsilon: handle immediately
-                        self._execute_action(top, action, len(self.sem_stack))
-                    else:
-                        # Push post-action marker BEFORE reversed production
-                        # (so it fires AFTER all children are processed)
-                        saved_depth = len(self.sem_stack)
-                        self.stack.append(('@POST', top, action, saved_depth))
-                        for symbol in reversed(production):
-                            self.stack.append(symbol)
+                # Push semantic terminal onto sem_stack
+                if top in semantic_ids:
+                    sem_stack.append(tokens[pos])
 
-                    self.derivations.append((top, production))
+                # Next token; the stream ends with the '$' sentinel
+                pos += 1
+                cur = ids[pos]
+                skipped = 0
 
             else:
-                self._error(
-                    f"Internal parser error: Unknown symbol '{top}' on stack")
+                self.pos = pos
+                self.sp = sp
+                self._error_expected_terminal(types[pos], names[top])
 
             step += 1
-            if verbose:
-                print()
+            print()
 
-            if step > 200000:
-                self._error(
-                    "Parser exceeded maximum steps (possible infinite loop)")
-
-        # Stack empty - success
-        if self.sem_stack:
-            return self.sem_stack[-1]
-        return True
+        self.pos = pos
+        self.sp = sp
+        self._error("Parser exceeded maximum steps (possible infinite loop)")
 
     # ══════════════════════════════════════════════════════════════
     # ACTION EXECUTION
@@ -1181,98 +1374,74 @@ class TableDrivenParser:
 
     def _execute_action(self, nt, action, saved_depth):
         """Execute a semantic action after a production's children are processed."""
-
         if action == 'PASS_THROUGH':
             # Child's result is already on sem_stack — nothing to do
             return
 
-        if action == 'EPSILON':
-            self.sem_stack.append(None)
-            return
-
-        if action == 'EPSILON_LIST':
-            self.sem_stack.append([])
-            return
-
-        if action == 'EPSILON_TAIL':
-            self.sem_stack.append(_TAIL_EMPTY)
-            return
+        handler = self._custom_actions.get(action)
+        if handler:
+            handler(self, saved_depth)
+        # else: no action needed (e.g., for simple forwarding NTs)
 
-        if action == 'FOLD_TAIL':
-            # sem_stack has: ... left_operand tail_result
-            tail = self.sem_stack.pop()
-            left = self.sem_stack.pop()
-            if tail is _TAIL_EMPTY or tail is None:
-                self.sem_stack.append(left)
-            else:
-                # tail is a list of (op_token, right_expr) pairs
-                result = left
-                for op_tok, right in tail:
-                    op_str = op_tok.type if hasattr(
-                        op_tok, 'type') else str(op_tok)
-                    ln, col = self._token_loc(op_tok)
-                    result = BinaryOp(op=op_str, left=result,
-                                      right=right, line=ln, col=col)
-                self.sem_stack.append(result)
-            return
+    # GENERIC ACTION HANDLERS
 
-        if action == 'BUILD_TAIL':
-            # sem_stack has: ... op_token operand tail_result
-            tail = self.sem_stack.pop()
-            operand = self.sem_stack.pop()
-            op_tok = self.sem_stack.pop()
-            pair = (op_tok, operand)
-            if tail is _TAIL_EMPTY or tail is None:
-                self.sem_stack.append([pair])
-            else:
-                self.sem_stack.append([pair] + tail)
-            return
+    def _action_epsilon(self, saved_depth):
+        self.sem_stack.append(None)
 
-        if action == 'FOLD_EXP':
-            # sem_stack has: ... base exp_tail_result
-            tail = self.sem_stack.pop()
-            base = self.sem_stack.pop()
-            if tail is _TAIL_EMPTY or tail is None:
-                self.sem_stack.append(base)
-            else:
-                op_tok, right = tail
-                op_str = op_tok.type if hasattr(
-                    op_tok, 'type') else str(op_tok)
-                ln, col = self._token_loc(op_tok)
-                self.sem_stack.append(
-                    BinaryOp(op=op_str, left=base, right=right, line=ln, col=col))
-            return
+    def _action_epsilon_list(self, saved_depth):
+        self.sem_stack.append([])
 
-        if action == 'BUILD_EXP_TAIL':
-            # sem_stack has: ... ** <exp_result>
-            right = self.sem_stack.pop()
-            op_tok = self.sem_stack.pop()
-            self.sem_stack.append((op_tok, right))
-            return
+    def _action_epsilon_tail(self, saved_depth):
+        self.sem_stack.append(_TAIL_EMPTY)
+
+    def _action_fold_tail(self, saved_depth):
+        # sem_stack has: ... left op1 right1 op2 right2 ...
+        sem_stack = self.sem_stack
+        result = sem_stack[saved_depth]
+        for i in range(saved_depth + 1, len(sem_stack), 2):
+            op_tok = sem_stack[i]
+            op_str = op_tok.type if hasattr(op_tok, 'type') else str(op_tok)
+            ln, col = self._token_loc(op_tok)
+            result = BinaryOp(op=op_str, left=result,
+                              right=sem_stack[i + 1], line=ln, col=col)
+        del sem_stack[saved_depth:]
+        sem_stack.append(result)
+
+    def _action_fold_exp(self, saved_depth):
+        # sem_stack has: ... base exp_tail_result
+        tail = self.sem_stack.pop()
+        base = self.sem_stack.pop()
+        if tail is _TAIL_EMPTY or tail is None:
+            self.sem_stack.append(base)
+        else:
+            op_tok, right = tail
+            op_str = op_tok.type if hasattr(
+                op_tok, 'type') else str(op_tok)
+            ln, col = self._token_loc(op_tok)
+            self.sem_stack.append(
+                BinaryOp(op=op_str, left=base, right=right, line=ln, col=col))
 
-        if action == 'COLLECT_LIST':
-            # sem_stack has: ... item rest_list
-            rest = self.sem_stack.pop()
-            item = self.sem_stack.pop()
-            if not isinstance(rest, list):
-                rest = []
-            self.sem_stack.append([item] + rest)
-            return
+    def _action_build_exp_tail(self, saved_depth):
+        # sem_stack has: ... ** <exp_result>
+        right = self.sem_stack.pop()
+        op_tok = self.sem_stack.pop()
+        self.sem_stack.append((op_tok, right))
 
-        if action == 'COLLECT_LIST_TAIL':
-            # sem_stack has: ... item rest_list  (comma was a structural terminal, not pushed)
-            rest = self.sem_stack.pop()
-            item = self.sem_stack.pop()
-            if not isinstance(rest, list):
-                rest = []
-            self.sem_stack.append([item] + rest)
-            return
+    def _action_collect_list(self, saved_depth):
+        # sem_stack has: ... item rest_list
+        rest = self.sem_stack.pop()
+        item = self.sem_stack.pop()
+        if not isinstance(rest, list):
+            rest = []
+        self.sem_stack.append([item] + rest)
 
-        # ── CUSTOM actions ──────────────────────────────────
-        handler = self._custom_actions.get(action)
-        if handler:
-            handler(self, saved_depth)
-        # else: no action needed (e.g., for simple forwarding NTs)
+    def _action_collect_list_tail(self, saved_depth):
+        # sem_stack has: ... item rest_list  (comma was a structural terminal, not pushed)
+        rest = self.sem_stack.pop()
+        item = self.sem_stack.pop()
+        if not isinstance(rest, list):
+            rest = []
+        self.sem_stack.append([item] + rest)
 
     # CUSTOM ACTION HANDLERS
 
@@ -1327,7 +1496,7 @@ class TableDrivenParser:
 
     def _action_global_modifier(self, saved_depth):
         # sem_stack has: ... fixed_token
-        tok = self.sem_stack.pop()
+        self.sem_stack.pop()
         self.sem_stack.append(True)
 
     def _action_global_modifier_epsilon(self, saved_depth):
@@ -1451,10 +1620,6 @@ class TableDrivenParser:
         else:
             self.sem_stack.append(Program(groups=[group]))
 
-    def _action_group_part_base(self, saved_depth):
-        # sem_stack has: ... worldwide_result (which is already a Program)
-        pass
-
     def _action_worldwide_part_recursive(self, saved_depth):
         # sem_stack has: ... worldwide_decl program_node
         program = self.sem_stack.pop()
@@ -1465,10 +1630,6 @@ class TableDrivenParser:
         else:
             self.sem_stack.append(Program(worldwide_decls=[ww_decl]))
 
-    def _action_worldwide_part_base(self, saved_depth):
-        # sem_stack has: ... define_result (which is already a Program)
-        pass
-
     def _action_define_part_recursive(self, saved_depth):
         # sem_stack has: ... func_def program_node
         program = self.sem_stack.pop()
@@ -1529,7 +1690,7 @@ class TableDrivenParser:
     def _action_fixed_declaration(self, saved_depth):
         # sem_stack has: ... fixed_token fixed_decl_node
         decl = self.sem_stack.pop()
-        _fixed_tok = self.sem_stack.pop()  # discard 'fixed' token
+        self.sem_stack.pop()  # discard 'fixed' token
         self.sem_stack.append(decl)
 
     def _action_list_typed_decl(self, saved_depth):
@@ -1620,37 +1781,6 @@ class TableDrivenParser:
         else:
             self.sem_stack.append(suffix)
 
-    def _action_assignable_suffix_index(self, saved_depth):
-        # sem_stack has: ... (id_tok is below us) index_expr assignable_2d_result
-        # Do NOT pop id_tok — _action_assignable will handle it.
-        a2d = self.sem_stack.pop()
-        idx1 = self.sem_stack.pop()
-        if isinstance(a2d, tuple) and a2d[0] == 'MEMBER':
-            self.sem_stack.append(
-                IndexedMemberAccess(index=idx1, member=a2d[1]))
-        else:
-            idx2 = a2d if a2d is not None else None
-            self.sem_stack.append(ListAccess(index1=idx1, index2=idx2))
-
-    def _action_assignable_suffix_member(self, saved_depth):
-        # sem_stack has: ... (id_tok is below us) member_identifier_token
-        # Do NOT pop id_tok — _action_assignable will handle it.
-        member_tok = self.sem_stack.pop()
-        member = member_tok.value if hasattr(
-            member_tok, 'value') else str(member_tok)
-        self.sem_stack.append(MemberAccess(member=member))
-
-    def _action_assignable_suffix_epsilon(self, saved_depth):
-        self.sem_stack.append(None)
-
-    def _action_assignable_2d_index(self, saved_depth):
-        # sem_stack has: ... index_expr
-        # Just leave the index on the stack — parent will use it
-        pass
-
-    def _action_assignable_2d_epsilon(self, saved_depth):
-        self.sem_stack.append(None)
-
     def _action_assignment_statement(self, saved_depth):
         # sem_stack has: ... target_expr assignment_tail_result
         tail = self.sem_stack.pop()
@@ -1680,13 +1810,13 @@ class TableDrivenParser:
     def _action_assignment_tail_increment(self, saved_depth):
         # ++ ;
         # sem_stack has: ... ++_token
-        _tok = self.sem_stack.pop()
+        self.sem_stack.pop()
         self.sem_stack.append(Increment())
 
     def _action_assignment_tail_decrement(self, saved_depth):
         # -- ;
         # sem_stack has: ... --_token
-        _tok = self.sem_stack.pop()
+        self.sem_stack.pop()
         self.sem_stack.append(Decrement())
 
     def _action_function_call(self, saved_depth):
@@ -1743,14 +1873,21 @@ class TableDrivenParser:
         name = id_tok.value if hasattr(id_tok, 'value') else str(id_tok)
         self.sem_stack.append(ReadStmt(variable=name, line=ln, col=col))
 
-    def _action_check_structure(self, saved_depth):
-        # check ( cond ) { stmts } otherwise_chain
-        # sem_stack has: ... cond stmts otherwise_chain_result
-        chain = self.sem_stack.pop()
+    def _pop_cond_block(self):
+        """Pop the `( cond ) { stmts }` pair shared by check/otherwisecheck/during."""
         stmts = self.sem_stack.pop()
         cond = self.sem_stack.pop()
         if not isinstance(stmts, list):
             stmts = []
+        ln = cond.line if hasattr(cond, 'line') else 0
+        col = cond.col if hasattr(cond, 'col') else 0
+        return cond, stmts, ln, col
+
+    def _action_check_structure(self, saved_depth):
+        # check ( cond ) { stmts } otherwise_chain
+        # sem_stack has: ... cond stmts otherwise_chain_result
+        chain = self.sem_stack.pop()
+        cond, stmts, ln, col = self._pop_cond_block()
 
         elif_branches = []
         else_body = None
@@ -1761,8 +1898,6 @@ class TableDrivenParser:
                 elif isinstance(item, list):
                     else_body = item
 
-        ln = cond.line if hasattr(cond, 'line') else 0
-        col = cond.col if hasattr(cond, 'col') else 0
         self.sem_stack.append(
             IfChain(condition=cond, body=stmts, elif_branches=elif_branches,
                     else_body=else_body, line=ln, col=col)
@@ -1772,12 +1907,7 @@ class TableDrivenParser:
         # otherwisecheck ( cond ) { stmts } otherwise_chain
         # sem_stack has: ... cond stmts rest_chain
         rest = self.sem_stack.pop()
-        stmts = self.sem_stack.pop()
-        cond = self.sem_stack.pop()
-        if not isinstance(stmts, list):
-            stmts = []
-        ln = cond.line if hasattr(cond, 'line') else 0
-        col = cond.col if hasattr(cond, 'col') else 0
+        cond, stmts, ln, col = self._pop_cond_block()
         branch = ElifBranch(condition=cond, body=stmts, line=ln, col=col)
         if isinstance(rest, list):
             self.sem_stack.append([branch] + rest)
@@ -1868,12 +1998,7 @@ class TableDrivenParser:
     def _action_during_loop(self, saved_depth):
         # during ( cond ) { stmts }
         # sem_stack has: ... cond stmts
-        stmts = self.sem_stack.pop()
-        cond = self.sem_stack.pop()
-        if not isinstance(stmts, list):
-            stmts = []
-        ln = cond.line if hasattr(cond, 'line') else 0
-        col = cond.col if hasattr(cond, 'col') else 0
+        cond, stmts, ln, col = self._pop_cond_block()
         self.sem_stack.append(
             DuringLoop(condition=cond, body=stmts, line=ln, col=col)
         )
@@ -1896,10 +2021,6 @@ class TableDrivenParser:
         self.sem_stack.append(
             UnaryOp(op='!', operand=operand, line=ln, col=col))
 
-    def _action_unary_passthrough(self, saved_depth):
-        # <post> — just pass through
-        pass
-
     def _action_prim_paren(self, saved_depth):
         # ( expr ) — expr is already on the stack, nothing to do
         pass
@@ -2062,9 +2183,6 @@ class TableDrivenParser:
         self.sem_stack.append(
             UnaryOp(op='-', operand=operand, line=ln, col=col))
 
-    def _action_index_unary_passthrough(self, saved_depth):
-        pass
-
     def _action_from_primary_num(self, saved_depth):
         tok = self.sem_stack.pop()
         ln, col = self._token_loc(tok)
@@ -2081,98 +2199,18 @@ class TableDrivenParser:
         self.sem_stack.append(
             Literal(token_type='decimal_lit', value=str(val), line=ln, col=col))
 
-    def _action_range_primary_id(self, saved_depth):
-        # identifier <id_suffix>
-        # Same as _action_prim_identifier
-        self._action_prim_identifier(saved_depth)
-
     # ══════════════════════════════════════════════════════════════
-    # CUSTOM ACTION DISPATCH TABLE
+    # ACTION REGISTRY — maps (NT, production_tuple) to action name
     # ══════════════════════════════════════════════════════════════
 
-    _custom_actions = {}
-
-    def _register_custom_actions(self):
-        """Build the custom action dispatch table based on specific productions."""
-        # This is called once. We map action string → handler.
-        # Since _build_action_registry assigns 'CUSTOM_<nt>' for complex NTs,
-        # we need to register each one.
-        pass
-
-    # Override _build_action_registry to assign specific custom action names
-    # to specific productions (not just 'CUSTOM_<nt>' for all productions of an NT)
     def _build_action_registry(self):
         """Classify all productions into action categories with specific custom actions."""
         self.production_actions = {}
 
-        self._semantic_terminals = {
-            'identifier', 'num_lit', 'decimal_lit', 'string_lit', 'char_lit',
-            'Yes', 'No',
-            # Binary operators (needed for BUILD_TAIL / expression actions)
-            '+', '-', '*', '/', '//', '%', '**',
-            '||', '&&', '==', '!=', '>', '<', '>=', '<=',
-            # Compound assignment ops & increment/decrement
-            '+=', '-=', '*=', '/=', '//=', '%=', '**=', '++', '--',
-            # Unary
-            '!',
-            # Type keywords
-            'num', 'decimal', 'bigdecimal', 'bool', 'text', 'letter', 'empty',
-            # Keywords with semantic value
-            'fixed', 'stop', 'skip',
-            # NOTE: '=' is NOT semantic — it appears in declarations and
-            # assignment_tail but the specific production already determines
-            # the action to take.
-        }
-
-        pass_through_nts = {
-            '<program>', '<stmt_value>', '<arg_value>', '<cond_value>',
-            '<index_value>',
-            '<stmt_post>', '<arg_post>', '<index_post>',
-            '<control_statement>', '<iterative_statement>',
-            '<declaration>', '<statement>',
-        }
-
-        fold_tail_nts = {
-            '<stmt_or>', '<stmt_and>', '<stmt_eq>', '<stmt_rel>',
-            '<stmt_add>', '<stmt_mult>',
-            '<arg_or>', '<arg_and>', '<arg_eq>', '<arg_rel>',
-            '<arg_add>', '<arg_mult>',
-            '<index_add>', '<index_mult>',
-        }
-
-        build_tail_nts = {
-            '<stmt_or_tail>', '<stmt_and_tail>', '<stmt_eq_tail>',
-            '<stmt_rel_tail>', '<stmt_add_tail>', '<stmt_mult_tail>',
-            '<arg_or_tail>', '<arg_and_tail>', '<arg_eq_tail>',
-            '<arg_rel_tail>', '<arg_add_tail>', '<arg_mult_tail>',
-            '<index_add_tail>', '<index_mult_tail>',
-        }
-
-        fold_exp_nts = {
-            '<stmt_exp>', '<arg_exp>', '<index_exp>',
-        }
-
-        build_exp_tail_nts = {
-            '<stmt_exp_tail>', '<arg_exp_tail>', '<index_exp_tail>',
-        }
-
-        list_accum_nts = {
-            '<statements>', '<option_statements>',
-            '<local_declarations>',
-            '<group_body>', '<group_body_tail>',
-            '<option_blocks>',
-            '<val_list_rows>', '<val_list_rows_tail>',
-        }
-
-        list_tail_nts = {
-            '<parameter_list_tail>', '<arg_list_tail>',
-            '<val_list_tail>',
-        }
-
         for nt, prods in self.productions.items():
             for prod in prods:
-                key = (nt, tuple(prod))
-                is_epsilon = prod == ['λ']
+                key = (nt, prod)
+                is_epsilon = prod == ('λ',)
 
                 # ── Handle specific custom productions first ────
 
@@ -2226,7 +2264,7 @@ class TableDrivenParser:
 
                 # Global decl choice (left-factored: var vs list)
                 if nt == '<global_decl_choice>':
-                    if prod == ['list', '<list_typed_decl>']:
+                    if prod == ('list', '<list_typed_decl>'):
                         self.production_actions[key] = 'CUSTOM_global_decl_choice_list'
                     else:
                         self.production_actions[key] = 'CUSTOM_global_decl_choice_var'
@@ -2247,7 +2285,7 @@ class TableDrivenParser:
 
                 # Return tail
                 if nt == '<return_tail>':
-                    if prod == [';']:
+                    if prod == (';',):
                         self.production_actions[key] = 'CUSTOM_return_tail_empty'
                     else:
                         self.production_actions[key] = 'CUSTOM_return_tail_value'
@@ -2273,7 +2311,7 @@ class TableDrivenParser:
 
                 # Group part
                 if nt == '<group_part>':
-                    if prod == ['<group_definitions>', '<group_part>']:
+                    if prod == ('<group_definitions>', '<group_part>'):
                         self.production_actions[key] = 'CUSTOM_group_part_recursive'
                     else:
                         self.production_actions[key] = 'PASS_THROUGH'
@@ -2281,7 +2319,7 @@ class TableDrivenParser:
 
                 # Worldwide part
                 if nt == '<worldwide_part>':
-                    if prod == ['<global_variable_declarations>', '<worldwide_part>']:
+                    if prod == ('<global_variable_declarations>', '<worldwide_part>'):
                         self.production_actions[key] = 'CUSTOM_worldwide_part_recursive'
                     else:
                         self.production_actions[key] = 'PASS_THROUGH'
@@ -2289,7 +2327,7 @@ class TableDrivenParser:
 
                 # Define part
                 if nt == '<define_part>':
-                    if prod == ['<function_definitions>', '<define_part>']:
+                    if prod == ('<function_definitions>', '<define_part>'):
                         self.production_actions[key] = 'CUSTOM_define_part_recursive'
                     else:
                         self.production_actions[key] = 'CUSTOM_define_part_base'
@@ -2297,7 +2335,7 @@ class TableDrivenParser:
 
                 # Local declaration
                 if nt == '<local_declaration>':
-                    if prod == ['identifier', 'identifier', ';']:
+                    if prod == ('identifier', 'identifier', ';'):
                         self.production_actions[key] = 'CUSTOM_local_declaration_group_typed'
                     else:
                         self.production_actions[key] = 'CUSTOM_local_declaration_typed'
@@ -2315,7 +2353,7 @@ class TableDrivenParser:
 
                 # List typed decl
                 if nt == '<list_typed_decl>':
-                    if prod == ['identifier', 'identifier', '=', 'num_lit', ';']:
+                    if prod == ('identifier', 'identifier', '=', 'num_lit', ';'):
                         self.production_actions[key] = 'CUSTOM_list_typed_decl_group'
                     else:
                         self.production_actions[key] = 'CUSTOM_list_typed_decl'
@@ -2351,24 +2389,6 @@ class TableDrivenParser:
                     self.production_actions[key] = 'CUSTOM_assignable'
                     continue
 
-                if nt == '<assignable_suffix>':
-                    if is_epsilon:
-                        self.production_actions[key] = 'CUSTOM_assignable_suffix_epsilon'
-                    elif prod[0] == '[':
-                        self.production_actions[key] = 'CUSTOM_assignable_suffix_index'
-                    elif prod[0] == '.':
-                        self.production_actions[key] = 'CUSTOM_assignable_suffix_member'
-                    continue
-
-                if nt == '<assignable_2d>':
-                    if is_epsilon:
-                        self.production_actions[key] = 'CUSTOM_assignable_2d_epsilon'
-                    elif prod[0] == '.':
-                        self.production_actions[key] = 'CUSTOM_var_2d_member'
-                    else:
-                        self.production_actions[key] = 'CUSTOM_assignable_2d_index'
-                    continue
-
                 # Assignment statement
                 if nt == '<assignment_statement>':
                     self.production_actions[key] = 'CUSTOM_assignment_statement'
@@ -2483,40 +2503,39 @@ class TableDrivenParser:
                         self.production_actions[key] = 'CUSTOM_prim_paren'
                     elif prod[0] == 'identifier':
                         self.production_actions[key] = 'CUSTOM_prim_identifier'
-                    elif prod == ['<literal>']:
+                    elif prod == ('<literal>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<size_call>']:
+                    elif prod == ('<size_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<textlen_call>']:
+                    elif prod == ('<textlen_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<charat_call>']:
+                    elif prod == ('<charat_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<ord_call>']:
+                    elif prod == ('<ord_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
                     continue
 
                 if nt == '<index_prim>':
                     if prod[0] == '(':
                         self.production_actions[key] = 'CUSTOM_prim_paren'
-                    elif prod == ['num_lit']:
+                    elif prod == ('num_lit',):
                         self.production_actions[key] = 'CUSTOM_index_prim_num'
-                    elif prod == ['decimal_lit']:
+                    elif prod == ('decimal_lit',):
                         self.production_actions[key] = 'CUSTOM_index_prim_decimal'
                     elif prod[0] == 'identifier':
                         self.production_actions[key] = 'CUSTOM_prim_identifier'
-                    elif prod == ['<size_call>']:
+                    elif prod == ('<size_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<textlen_call>']:
+                    elif prod == ('<textlen_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<charat_call>']:
+                    elif prod == ('<charat_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<ord_call>']:
+                    elif prod == ('<ord_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
                     continue
 
-                # Id suffix (for all expression contexts)
-                if nt in ('<stmt_id_suffix>', '<arg_id_suffix>', '<index_id_suffix>',
-                          '<from_id_suffix>', '<to_id_suffix>', '<step_id_suffix>'):
+                # Id suffix (for all expression contexts and assignment targets)
+                if nt in _ID_SUFFIX_NTS or nt == '<assignable_suffix>':
                     if is_epsilon:
                         self.production_actions[key] = 'CUSTOM_id_suffix_epsilon'
                     elif prod[0] == '(':
@@ -2528,9 +2547,7 @@ class TableDrivenParser:
                     continue
 
                 # Var 2d suffixes
-                if nt in ('<stmt_var_2d>', '<arg_var_2d>', '<index_var_2d>',
-                          '<from_var_2d>', '<to_var_2d>', '<step_var_2d>',
-                          '<assignable_2d>'):
+                if nt in _VAR_2D_NTS or nt == '<assignable_2d>':
                     if is_epsilon:
                         self.production_actions[key] = 'CUSTOM_var_2d_epsilon'
                     elif prod[0] == '.':
@@ -2565,65 +2582,75 @@ class TableDrivenParser:
 
                 # Range primaries (from/to/step)
                 if nt in ('<from_primary>', '<to_primary>', '<step_primary>'):
-                    if prod == ['num_lit']:
+                    if prod == ('num_lit',):
                         self.production_actions[key] = 'CUSTOM_from_primary_num'
-                    elif prod == ['decimal_lit']:
+                    elif prod == ('decimal_lit',):
                         self.production_actions[key] = 'CUSTOM_from_primary_decimal'
                     elif prod[0] == 'identifier':
                         self.production_actions[key] = 'CUSTOM_prim_identifier'
-                    elif prod == ['<size_call>']:
+                    elif prod == ('<size_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<textlen_call>']:
+                    elif prod == ('<textlen_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<charat_call>']:
+                    elif prod == ('<charat_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
-                    elif prod == ['<ord_call>']:
+                    elif prod == ('<ord_call>',):
                         self.production_actions[key] = 'PASS_THROUGH'
                     continue
 
                 # ── Standard categories ─────────────────────────
                 if is_epsilon:
-                    if nt in list_accum_nts or nt in list_tail_nts:
+                    if nt in _LIST_ACCUM_NTS or nt in _LIST_TAIL_NTS:
                         self.production_actions[key] = 'EPSILON_LIST'
-                    elif nt in build_tail_nts or nt in build_exp_tail_nts:
+                    elif nt in _BINARY_TAIL_NTS:
+                        self.production_actions[key] = 'PASS_THROUGH'
+                    elif nt in _BUILD_EXP_TAIL_NTS:
                         self.production_actions[key] = 'EPSILON_TAIL'
                     else:
                         self.production_actions[key] = 'EPSILON'
                     continue
 
-                if nt in pass_through_nts:
+                if nt in _PASS_THROUGH_NTS:
                     self.production_actions[key] = 'PASS_THROUGH'
                     continue
 
-                if nt in fold_tail_nts:
+                if nt in _FOLD_TAIL_NTS:
                     self.production_actions[key] = 'FOLD_TAIL'
                     continue
 
-                if nt in build_tail_nts:
-                    self.production_actions[key] = 'BUILD_TAIL'
+                if nt in _BINARY_TAIL_NTS:
+                    self.production_actions[key] = 'PASS_THROUGH'
                     continue
 
-                if nt in fold_exp_nts:
+                if nt in _FOLD_EXP_NTS:
                     self.production_actions[key] = 'FOLD_EXP'
                     continue
 
-                if nt in build_exp_tail_nts:
+                if nt in _BUILD_EXP_TAIL_NTS:
                     self.production_actions[key] = 'BUILD_EXP_TAIL'
                     continue
 
-                if nt in list_accum_nts:
+                if nt in _LIST_ACCUM_NTS:
                     self.production_actions[key] = 'COLLECT_LIST'
                     continue
 
-                if nt in list_tail_nts:
+                if nt in _LIST_TAIL_NTS:
                     self.production_actions[key] = 'COLLECT_LIST_TAIL'
                     continue
 
                 # Fallback
                 self.production_actions[key] = 'PASS_THROUGH'
 
-        # Build the custom actions dispatch table
+        # Build the action dispatch table (generic + custom)
         self._custom_actions = {
+            'EPSILON': TableDrivenParser._action_epsilon,
+            'EPSILON_LIST': TableDrivenParser._action_epsilon_list,
+            'EPSILON_TAIL': TableDrivenParser._action_epsilon_tail,
+            'FOLD_TAIL': TableDrivenParser._action_fold_tail,
+            'FOLD_EXP': TableDrivenParser._action_fold_exp,
+            'BUILD_EXP_TAIL': TableDrivenParser._action_build_exp_tail,
+            'COLLECT_LIST': TableDrivenParser._action_collect_list,
+            'COLLECT_LIST_TAIL': TableDrivenParser._action_collect_list_tail,
             'CUSTOM_datatype': TableDrivenParser._action_datatype,
             'CUSTOM_return_type': TableDrivenParser._action_return_type,
             'CUSTOM_literal': TableDrivenParser._action_literal,
@@ -2659,11 +2686,6 @@ class TableDrivenParser:
             'CUSTOM_val_list_elems': TableDrivenParser._action_val_list_elems,
             'CUSTOM_val_list_2d': TableDrivenParser._action_val_list_2d,
             'CUSTOM_assignable': TableDrivenParser._action_assignable,
-            'CUSTOM_assignable_suffix_index': TableDrivenParser._action_assignable_suffix_index,
-            'CUSTOM_assignable_suffix_member': TableDrivenParser._action_assignable_suffix_member,
-            'CUSTOM_assignable_suffix_epsilon': TableDrivenParser._action_assignable_suffix_epsilon,
-            'CUSTOM_assignable_2d_index': TableDrivenParser._action_assignable_2d_index,
-            'CUSTOM_assignable_2d_epsilon': TableDrivenParser._action_assignable_2d_epsilon,
             'CUSTOM_assignment_statement': TableDrivenParser._action_assignment_statement,
             'CUSTOM_assignment_tail_eq': TableDrivenParser._action_assignment_tail_eq,
             'CUSTOM_assignment_tail_compound': TableDrivenParser._action_assignment_tail_compound,
@@ -2713,26 +2735,49 @@ class TableDrivenParser:
             'CUSTOM_from_primary_decimal': TableDrivenParser._action_from_primary_decimal,
         }
 
-    def advance(self):
-        """Move to next token"""
-        self.pos += 1
-        if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
+    # ── Cold error paths (kept out of the parse loop body) ──────
+
+    def _error_expected_terminal(self, current, top):
+        """Report a terminal on the stack that does not match the input."""
+        self._error(f"Unexpected: '{current}'\nExpected: '{top}'")
+
+    def _error_statement_lookahead(self, next_token):
+        """Report a bad second token after an identifier at statement start."""
+        self._error(f"Unexpected: '{next_token}'\n"
+                    + _STATEMENT_LOOKAHEAD_EXPECTED)
+
+    def _error_no_production(self, top_id):
+        """Report a missing LL(1) table entry for top_id on the input."""
+        top = self.symbols[top_id]
+        current = self.token_types[self.pos]
+        expected = sorted(self._mask_symbols(
+            self.row_mask[top_id] | self.skipped_expected))
+        if expected:
+            exp_str = ', '.join(f"'{e}'" for e in expected)
+            self._error(
+                f"Unexpected: '{current}'\nExpected: {exp_str}")
         else:
-            self.current_token = None
+            self._error(
+                f"Unexpected: '{current}'\nNo valid continuation for {top}")
 
     def _error(self, message):
         """Report parsing error with location"""
-        token = self.current_token
-
-        if token and hasattr(token, 'pos_start') and token.pos_start:
-            line = token.pos_start.ln + 1
-            col = token.pos_start.col + 1
+        # Plain strings are accepted as tokens (see _token_type), so the
+        # position is optional, as in _token_loc
+        pos = getattr(self.current_token, 'pos_start', None)
+        if pos:
+            line = pos.ln + 1
+            col = pos.col + 1
             raise SyntaxError(
                 f"Parse Error at Line {line}, Column {col}\n{message}")
         else:
             raise SyntaxError(f"Parse Error\n{message}")
 
+    def get_derivations(self):
+        """Recorded derivation steps as (non-terminal, production) pairs"""
+        return [(self.symbols[self.prod_lhs[p]], self.prod_symbols[p])
+                for p in self.derivations]
+
     def print_statistics(self):
         """Print grammar statistics"""
         print("\n" + "="*80)
@@ -2752,7 +2797,13 @@ class TableDrivenParser:
                 f"\n⚠ Grammar has {len(self.conflicts)} conflicts (requires lookahead)")
 
 
+class _GrammarBuilder(TableDrivenParser):
+    """Unslotted parser used only to run the grammar build methods"""
+
+
 class Token:
+    __slots__ = ('type', 'value', 'pos_start', 'pos_end')
+
     def __init__(self, type, value=None, pos_start=None, pos_end=None):
         self.type = type
         self.value = value
@@ -2765,6 +2816,10 @@ class Token:
         return f'Token({self.type})'
 
 
+# End-of-input sentinel appended to every token stream
+_EOF_TOKEN = Token('$')
+
+
 if __name__ == "__main__":
     print("OPTIMIZED CONTEXT-SPECIFIC TABLE-DRIVEN LL(1) PARSER")
     print("="*80)
@@ -338,6 +338,8 @@ class LexicalError(Error):
 
 
 class Token:
+    __slots__ = ('type', 'value', 'lexeme', 'pos_start', 'pos_end')
+
     def __init__(self, type, value=None, pos_start=None, pos_end=None):
         self.type = type
         self.value = value
@@ -347,6 +349,9 @@ class Token:
             self.pos_start = pos_start.copy()
             self.pos_end = pos_start.copy()
             self.pos_end.advance()
+        else:
+            self.pos_start = None
+            self.pos_end = None
 
         if pos_end:
             self.pos_end = pos_end
@@ -357,36 +362,41 @@ class Token:
         return f'{self.type}'
 
 
+# Lexer token types → parser-expected types (built once, not per token)
+_PARSER_TYPE_MAP = {
+    LIT_NUMBER: 'num_lit',
+    LIT_DECIMAL: 'decimal_lit',
+    LIT_STRING: 'string_lit',
+    LIT_CHARACTER: 'char_lit',
+    IDENTIFIER: 'identifier',
+    DELIM_SEMICOLON: ';',
+    DELIM_COMMA: ',',
+    DELIM_LEFT_PAREN: '(',
+    DELIM_RIGHT_PAREN: ')',
+    DELIM_LEFT_BRACE: '{',
+    DELIM_RIGHT_BRACE: '}',
+    DELIM_LEFT_BRACKET: '[',
+    DELIM_RIGHT_BRACKET: ']',
+    DELIM_COLON: ':',
+    DELIM_DOT: '.',
+}
+
+# Token types the parser never sees
+_PARSER_SKIP_TYPES = frozenset({NEWLINE, WHITESPACE_SPACE,
+                                WHITESPACE_TAB, COMMENT_SINGLE, COMMENT_MULTI, EOF})
+
+
 def map_token_type_for_parser(token_type):
     """Map lexer token types to parser-expected types"""
-    mapping = {
-        LIT_NUMBER: 'num_lit',
-        LIT_DECIMAL: 'decimal_lit',
-        LIT_STRING: 'string_lit',
-        LIT_CHARACTER: 'char_lit',
-        IDENTIFIER: 'identifier',
-        DELIM_SEMICOLON: ';',
-        DELIM_COMMA: ',',
-        DELIM_LEFT_PAREN: '(',
-        DELIM_RIGHT_PAREN: ')',
-        DELIM_LEFT_BRACE: '{',
-        DELIM_RIGHT_BRACE: '}',
-        DELIM_LEFT_BRACKET: '[',
-        DELIM_RIGHT_BRACKET: ']',
-        DELIM_COLON: ':',
-        DELIM_DOT: '.',
-    }
-    return mapping.get(token_type, token_type)
+    return _PARSER_TYPE_MAP.get(token_type, token_type)
 
 
 def prepare_tokens_for_parser(tokens):
     """Filter out whitespace/comments and map token types"""
     filtered = []
-    skip_types = [NEWLINE, WHITESPACE_SPACE,
-                  WHITESPACE_TAB, COMMENT_SINGLE, COMMENT_MULTI, EOF]
 
     for token in tokens:
-        if token.type not in skip_types:
+        if token.type not in _PARSER_SKIP_TYPES:
             # Create new token with mapped type
             mapped_type = map_token_type_for_parser(token.type)
             filtered.append(Token(mapped_type, token.value,